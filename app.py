@@ -1,57 +1,547 @@
 import os
 import time
 import logging
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import threading
+import csv
+import codecs
+import mmap
+import hashlib
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from urllib.parse import parse_qsl
+import orjson
 from flask import Flask, request, jsonify
-import pandas as pd
-from werkzeug.exceptions import BadRequest
+from flask.json.provider import JSONProvider
+from filelock import FileLock
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: fall back to the stdlib csv parser
+    pa = pacsv = None
 
 DATA_PATH = os.path.join("data", "friends_data.csv")
+# Append-only log of PUT/DELETE changes not yet folded into DATA_PATH.
+JOURNAL_PATH = os.path.join("data", "friends_data.log")
+COMPACT_THRESHOLD = 10_000
+MAX_PER_PAGE = 1000
+# Far past the last page of any realistic table; larger page numbers clamp here.
+MAX_PAGE = 10**9
 
 # Logging
+# Request threads only enqueue records; a background listener formats them
+# (tracebacks included) and writes them to the file.
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the message and traceback in the calling
+    thread so records can be pickled; our queue is in-process, so records
+    go through untouched.
+    """
+
+    def prepare(self, record):
+        return record
+
 os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename="logs/app.log",
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s",
-)
+_log_file = logging.FileHandler("logs/app.log")
+_log_file.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_file, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.getLogger().addHandler(_DeferredQueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """Serve jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round trip of the base implementation.
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # CSV helpers
+REQUIRED_COLUMNS = ("id", "first_name", "last_name")
+
+def search_key(s):
+    """Case-folded UTF-8 form that names and search queries are compared in."""
+    return s.lower().encode("utf-8")
+
+class Table:
+    """Column-oriented copy of the CSV: one list of strings per column,
+    plus an id -> row index and lowercased UTF-8 name columns for search.
+
+    Once published by _publish a table is never mutated (apart from lazily
+    built search corpora); writers change a copy() and publish that.
+    """
+
+    def __init__(self, columns, values):
+        self.columns = columns
+        self.data = dict(zip(columns, values))
+        self.ids = self.data["id"]
+        self.first = self.data["first_name"]
+        self.last = self.data["last_name"]
+        self.idx = {}
+        # Cache key of the files this table reflects; see _stat_key.
+        self.version = None
+        self.first_lc = []
+        self.last_lc = []
+        self._corpus = {}
+
+    def build_indexes(self):
+        self.idx = {id: i for i, id in enumerate(self.ids)}
+        self._corpus = {}
+        self.first_lc = self._fold_column("first_name", self.first)
+        self.last_lc = self._fold_column("last_name", self.last)
+
+    def _fold_column(self, col, cells):
+        """Search-fold a whole column with one lower() and one encode() over
+        the NUL-joined text, which is also that column's search corpus."""
+        blob = "\0".join(cells).lower().encode("utf-8")
+        folded = blob.split(b"\0")
+        if len(folded) != len(cells):
+            # Empty column, or a cell that itself contains NUL.
+            folded = [search_key(s) for s in cells]
+            blob = b"\0".join(folded)
+        # Dedupe repeated names, as _read_table does for the str cells.
+        seen = {}
+        folded = [seen.setdefault(b, b) for b in folded]
+        self._corpus[col] = (blob, self._starts(folded))
+        return folded
+
+    @staticmethod
+    def _starts(cells):
+        return list(accumulate((len(cell) + 1 for cell in cells), initial=0))
+
+    def corpus(self, col):
+        """Return (blob, starts) for a lowercased name column: all cells
+        joined by NUL, and the offset in blob where each row begins.
+
+        Built at load, dropped whenever the column changes and rebuilt on
+        the next search.
+        """
+        c = self._corpus.get(col)
+        if c is None:
+            cells = self.first_lc if col == "first_name" else self.last_lc
+            c = self._corpus[col] = (b"\0".join(cells), self._starts(cells))
+        return c
+
+    def find(self, col, q):
+        """Return, in order, the rows whose lowercased ``col`` contains ``q``.
+
+        One pass of bytes.find over the corpus: after a hit, the scan resumes
+        at the next row, so the cost is one search plus O(log n) per match
+        rather than one search per row.
+        """
+        if b"\0" in q:
+            # Could straddle the separator; no real name contains NUL anyway.
+            cells = self.first_lc if col == "first_name" else self.last_lc
+            return [i for i, cell in enumerate(cells) if q in cell]
+        blob, starts = self.corpus(col)
+        hits = []
+        pos = blob.find(q)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            hits.append(i)
+            pos = blob.find(q, starts[i + 1])
+        return hits
+
+    def copy(self, cols=None):
+        """Return a Table that can be mutated without affecting this one.
+
+        Only ``cols`` (default: all columns) and the structures derived from
+        them are copied; every other column list is shared.
+        """
+        cols = self.columns if cols is None else cols
+        new = Table(self.columns, [list(self.data[c]) if c in cols else self.data[c] for c in self.columns])
+        new.idx = dict(self.idx) if "id" in cols else self.idx
+        new.first_lc = list(self.first_lc) if "first_name" in cols else self.first_lc
+        new.last_lc = list(self.last_lc) if "last_name" in cols else self.last_lc
+        new._corpus = dict(self._corpus)
+        return new
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, i):
+        return {c: self.data[c][i] for c in self.columns}
+
+    def update(self, i, changes):
+        """Assign ``changes`` (column -> value) to row i in one pass."""
+        for col, val in changes.items():
+            self.data[col][i] = val
+        if "first_name" in changes:
+            self.first_lc[i] = search_key(changes["first_name"])
+            self._corpus.pop("first_name", None)
+        if "last_name" in changes:
+            self.last_lc[i] = search_key(changes["last_name"])
+            self._corpus.pop("last_name", None)
+
+    def delete(self, i):
+        del self.idx[self.ids[i]]
+        for col in self.data.values():
+            del col[i]
+        del self.first_lc[i]
+        del self.last_lc[i]
+        self._corpus = {}
+        # Rows after i shifted down by one.
+        for j in range(i, len(self.ids)):
+            self.idx[self.ids[j]] = j
+
+# Current Table snapshot; its version is the _stat_key() it reflects.
+# Readers just dereference it, writers swap in a new one via _publish.
+_current = None
+# Serializes publishing a snapshot, whether from a reload or a write.
+_PUBLISH_LOCK = threading.RLock()
+# Serializes read-modify-write cycles in the PUT/DELETE handlers.
+_WRITE_LOCK = threading.Lock()
+# Cross-process guard for the CSV and journal.
+_FILE_LOCK = FileLock(DATA_PATH + ".lock", timeout=10)
+# Append-only fd for the journal and the number of records it holds.
+_JOURNAL = {"fd": None, "lines": 0}
+
+def _stat_key():
+    st = os.stat(DATA_PATH)
+    try:
+        jst = os.stat(JOURNAL_PATH)
+        journal = (jst.st_mtime_ns, jst.st_size)
+    except FileNotFoundError:
+        journal = None
+    return (st.st_mtime_ns, st.st_size, journal)
+
+def _parse_csv_arrow():
+    with open(DATA_PATH, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    if not header:
+        return [], []
+    # Name the columns ourselves so column_types is keyed exactly as Arrow
+    # sees them, and keep every column as a string, including empty cells.
+    read = pacsv.ReadOptions(use_threads=True, column_names=header, skip_rows=1)
+    convert = pacsv.ConvertOptions(
+        column_types={c: pa.string() for c in header},
+        strings_can_be_null=False,
+    )
+    with pa.memory_map(DATA_PATH) as src:
+        at = pacsv.read_csv(src, read_options=read, convert_options=convert)
+    values = [
+        (col if col.type == pa.string() else col.cast(pa.string())).to_pylist()
+        for col in at.columns
+    ]
+    return [c.strip() for c in header], values
+
+def _parse_csv_stdlib():
+    if os.path.getsize(DATA_PATH) == 0:
+        return [], []
+    # Parse straight out of the page cache instead of through a read buffer.
+    with open(DATA_PATH, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Skip a UTF-8 BOM (e.g. from Excel) so the first column is "id".
+        if mm[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            mm.seek(len(codecs.BOM_UTF8))
+        reader = csv.reader(line.decode("utf-8") for line in iter(mm.readline, b""))
+        header = [c.strip() for c in next(reader, [])]
+        values = [[] for _ in header]
+        width = len(header)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            for col, val in zip(values, row):
+                col.append(val)
+    return header, values
+
+def _publish(table, key):
+    """Make ``table`` the snapshot for the files as they are at ``key``.
+
+    Call with _PUBLISH_LOCK held.
+    """
+    global _current
+    table.version = key
+    _current = table
+    render_page.cache_clear()
+
+def _invalidate():
+    global _current
+    _current = None
+
+def _read_table():
+    header = values = None
+    if pacsv is not None:
+        try:
+            header, values = _parse_csv_arrow()
+        except pa.ArrowInvalid:
+            # e.g. short rows, which the stdlib path pads instead.
+            logger.warning("pyarrow could not parse %s, using csv module", DATA_PATH)
+    if header is None:
+        header, values = _parse_csv_stdlib()
+    if not all(c in header for c in REQUIRED_COLUMNS):
+        raise ValueError("CSV must contain id, first_name, last_name columns.")
+    # Share one object per repeated name. A per-load dict rather than
+    # sys.intern, whose strings are immortal on some CPython versions; the
+    # id index is built afterwards so its keys are these same objects.
+    seen = {}
+    for pos, c in enumerate(header):
+        if c in REQUIRED_COLUMNS:
+            values[pos] = [seen.setdefault(v, v) for v in values[pos]]
+    table = Table(header, values)
+    table.build_indexes()
+    _JOURNAL["lines"] = _replay_journal(table)
+    return table
+
+def _replay_journal(table):
+    """Apply journal records on top of the freshly read CSV.
+
+    Records are JSON arrays, one per newline-terminated line:
+    ``["U", id, column, value]`` or ``["D", id]``. Anything after the last
+    newline is a torn write that was never acknowledged and is ignored.
+    Malformed records (bad JSON, wrong shape, non-string fields) are logged
+    and skipped, as are records that no longer apply (unknown id or column).
+    """
+    if not os.path.exists(JOURNAL_PATH):
+        return 0
+    with open(JOURNAL_PATH, "rb") as f:
+        data = f.read()
+    lines = data[:data.rfind(b"\n") + 1].split(b"\n")[:-1]
+    for line in lines:
+        try:
+            rec = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            rec = None
+        if not (
+            isinstance(rec, list)
+            and (rec[:1] == ["U"] and len(rec) == 4 or rec[:1] == ["D"] and len(rec) == 2)
+            and all(isinstance(v, str) for v in rec[1:])
+        ):
+            logger.warning("Skipping malformed journal record %r", line[:200])
+            continue
+        i = table.idx.get(rec[1])
+        if i is None:
+            continue
+        if rec[0] == "U":
+            if rec[2] in table.data and rec[2] != "id":
+                table.update(i, {rec[2]: rec[3]})
+        else:
+            table.delete(i)
+    return len(lines)
+
 def load_csv():
+    """Return the CSV (plus journal) as a Table snapshot, re-reading only
+    when either file changed.
+
+    Lock-free unless a reload is needed. A reload holds _FILE_LOCK so no
+    process can append to or compact the files between reading the CSV and
+    replaying the journal, and re-stats under it so the published key
+    matches what was read. The snapshot must not be mutated; writers change
+    a copy() under _WRITE_LOCK and _FILE_LOCK and persist it with
+    append_journal.
+    """
     if not os.path.exists(DATA_PATH):
         raise FileNotFoundError("CSV not found.")
-    df = pd.read_csv(DATA_PATH, dtype=str, keep_default_na=False)
-    df.columns = [c.strip() for c in df.columns]
-    if "id" not in df.columns or "first_name" not in df.columns or "last_name" not in df.columns:
-        raise ValueError("CSV must contain id, first_name, last_name columns.")
-    return df
+    key = _stat_key()
+    table = _current
+    if table is not None and table.version == key:
+        return table
+    # Same order as writers: _FILE_LOCK, then _PUBLISH_LOCK.
+    with _FILE_LOCK, _PUBLISH_LOCK:
+        key = _stat_key()
+        table = _current
+        if table is not None and table.version == key:
+            return table
+        table = _read_table()
+        _publish(table, key)
+        return table
+
+def save_csv(table):
+    tmp = DATA_PATH + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(table.columns)
+        writer.writerows(zip(*(table.data[c] for c in table.columns)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, DATA_PATH)
+    _fsync_dir(DATA_PATH)
+
+def _fsync_dir(path):
+    """Make a create or rename of ``path`` durable by syncing its directory."""
+    if os.name == "nt":
+        # Windows can't open a directory for fsync; NTFS journals metadata.
+        return
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def append_journal(table, records):
+    """Durably append mutation records already applied to ``table``, then
+    publish ``table`` as the new snapshot.
+
+    Must be called under _FILE_LOCK. Folds the journal into the CSV once it
+    grows past COMPACT_THRESHOLD records.
+    """
+    # orjson escapes newlines inside values, so "\n" only ever ends a record.
+    payload = b"".join(orjson.dumps(rec) + b"\n" for rec in records)
+    # Readers that notice the files changed wait here for the new snapshot
+    # instead of re-parsing what we are writing.
+    with _PUBLISH_LOCK:
+        try:
+            if _JOURNAL["fd"] is None:
+                created = not os.path.exists(JOURNAL_PATH)
+                _JOURNAL["fd"] = os.open(JOURNAL_PATH, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+                if created:
+                    _fsync_dir(JOURNAL_PATH)
+            fd = _JOURNAL["fd"]
+            _trim_torn_tail(fd)
+            os.write(fd, payload)
+            os.fsync(fd)
+            _JOURNAL["lines"] += len(records)
+            if _JOURNAL["lines"] > COMPACT_THRESHOLD:
+                compact(table)
+            _publish(table, _stat_key())
+        except Exception:
+            # The files may be ahead of the last snapshot; force a re-read.
+            _invalidate()
+            raise
 
-def save_csv(df):
-    df.to_csv(DATA_PATH, index=False)
+def _trim_torn_tail(fd):
+    """Cut the journal back to its last complete record.
+
+    A writer that died mid-append leaves an unterminated line; appending
+    straight after it would glue our record onto it and lose both.
+    """
+    size = os.fstat(fd).st_size
+    end = size
+    while end > 0:
+        start = max(0, end - 4096)
+        os.lseek(fd, start, os.SEEK_SET)
+        chunk = os.read(fd, end - start)
+        nl = chunk.rfind(b"\n")
+        if nl != -1:
+            end = start + nl + 1
+            break
+        end = start
+    if end != size:
+        logger.warning("Dropping %d bytes of torn journal record", size - end)
+        os.ftruncate(fd, end)
+
+def compact(table):
+    """Write ``table`` out as the canonical CSV and empty the journal.
+
+    Must be called under _FILE_LOCK. Holds _PUBLISH_LOCK throughout so
+    concurrent readers wait instead of re-parsing a half-compacted pair.
+    """
+    with _PUBLISH_LOCK:
+        # save_csv fsyncs the new CSV and its directory entry before we get
+        # here, and replaying records already folded into the CSV is
+        # harmless, so a crash between the replace and the truncate loses
+        # nothing.
+        save_csv(table)
+        with open(JOURNAL_PATH, "ab") as f:
+            f.truncate(0)
+            os.fsync(f.fileno())
+        _JOURNAL["lines"] = 0
+        _publish(table, _stat_key())
 
 # Pagination
+def _parse_count(raw, default, limit):
+    """Parse a non-negative integer query value, clamped to ``limit``."""
+    if not raw.isdigit():
+        return default
+    # Anything longer than nine digits is past every limit anyway; checking
+    # the length first keeps huge digit strings away from int(), which
+    # rejects anything past sys.get_int_max_str_digits().
+    if len(raw) > 9:
+        return limit
+    return min(int(raw), limit)
+
 def parse_pagination():
-    try:
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 10))
-    except ValueError:
-        raise BadRequest("page and per_page must be integers.")
+    """Return (page, per_page) from the query string.
+
+    Anything that is not a plain non-negative integer falls back to the
+    default; oversized values are clamped, per_page to MAX_PER_PAGE.
+    """
+    qs = request.query_string
+    if not qs:
+        return 1, 10
+    args = dict(parse_qsl(qs))
+    page = _parse_count(args.get(b"page", b"1"), 1, MAX_PAGE)
+    per_page = _parse_count(args.get(b"per_page", b"10"), 10, MAX_PER_PAGE)
     return max(page, 1), max(per_page, 1)
 
-def paginate(df, page, per_page):
-    total = len(df)
+def paginate(table, page, per_page):
+    total = len(table)
     start = (page - 1) * per_page
     end = start + per_page
-    items = df.iloc[start:end].to_dict(orient="records")
     meta = {
         "page": page,
         "per_page": per_page,
         "total": total,
         "total_pages": (total + per_page - 1) // per_page,
     }
-    return items, meta
+    return start, end, meta
+
+def encode_page(table, start, end, meta):
+    """Encode rows [start, end) and meta straight into a JSON body."""
+    buf = bytearray(b'{"data":[')
+    cols = [table.data[c][start:end] for c in table.columns]
+    for vals in zip(*cols):
+        buf += orjson.dumps(dict(zip(table.columns, vals)))
+        buf += b","
+    if buf[-1:] == b",":
+        del buf[-1]
+    buf += b'],"meta":' + orjson.dumps(meta) + b"}"
+    return bytes(buf)
+
+@lru_cache(maxsize=256)
+def render_page(table, page, per_page):
+    """Cached JSON body of one list page.
+
+    Keyed by the snapshot itself, which never changes once published; the
+    cache is cleared on every publish so old snapshots can be freed.
+    """
+    start, end, meta = paginate(table, page, per_page)
+    return encode_page(table, start, end, meta)
+
+# Conditional GETs
+def make_etag(table, *params):
+    """Strong validator for a GET response: the data version plus the query."""
+    return hashlib.blake2b(repr((table.version, params)).encode("utf-8"), digest_size=8).hexdigest()
+
+def add_validators(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "max-age=0, must-revalidate"
+    return response
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds ``etag``, else None."""
+    if request.if_none_match.contains_weak(etag):
+        return add_validators(app.response_class(status=304), etag)
+    return None
+
+# Error responses
+# Bodies of the fixed error responses, encoded once at import.
+INTERNAL_ERROR = b'{"error":"Internal server error"}'
+MISSING_SEARCH_PARAMS = b'{"error":"Provide first_name or last_name"}'
+CHARACTER_NOT_FOUND = b'{"error":"Character not found"}'
+ROUTE_NOT_FOUND = b'{"error":"Route not found"}'
+
+def error_response(body, status):
+    return app.response_class(body, status=status, mimetype="application/json")
 
 # Request logging
 @app.after_request
@@ -66,77 +556,110 @@ def home():
         return jsonify({"home": "It works, ready to check endpoints"}), 200
     except:
         logger.exception("GET / failed")
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(INTERNAL_ERROR, 500)
 
 @app.get("/characters")
 def list_characters():
     try:
         page, per_page = parse_pagination()
-        df = load_csv()
-        items, meta = paginate(df, page, per_page)
-        return jsonify({"data": items, "meta": meta}), 200
+        table = load_csv()
+        etag = make_etag(table, page, per_page)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        body = render_page(table, page, per_page)
+        response = app.response_class(body, mimetype="application/json")
+        return add_validators(response, etag), 200
     
     except Exception:
         logger.exception("GET /characters failed")
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(INTERNAL_ERROR, 500)
     
 
 
 @app.get("/characters/search")
 def search_characters():
     try:
-        first = request.args.get("first_name", "").lower()
-        last = request.args.get("last_name", "").lower()
+        first = search_key(request.args.get("first_name", ""))
+        last = search_key(request.args.get("last_name", ""))
         if not first and not last:
-            return jsonify({"error": "Provide first_name or last_name"}), 400
+            return error_response(MISSING_SEARCH_PARAMS, 400)
 
-        df = load_csv()
-        if first:
-            df = df[df["first_name"].str.lower().str.contains(first)]
-        if last:
-            df = df[df["last_name"].str.lower().str.contains(last)]
+        table = load_csv()
+        etag = make_etag(table, first, last)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        if first and last:
+            # One corpus scan, driven by the longer (usually more selective)
+            # needle; the other filter only runs on its hits.
+            if len(last) > len(first):
+                scan, needle, other, other_lc = "last_name", last, first, table.first_lc
+            else:
+                scan, needle, other, other_lc = "first_name", first, last, table.last_lc
+            matches = [i for i in table.find(scan, needle) if other in other_lc[i]]
+        elif first:
+            matches = table.find("first_name", first)
+        else:
+            matches = table.find("last_name", last)
 
-        return jsonify({"data": df.to_dict(orient="records"), "count": len(df)}), 200
+        response = jsonify({"data": [table.row(i) for i in matches], "count": len(matches)})
+        return add_validators(response, etag), 200
     except Exception:
         logger.exception("GET /characters/search failed")
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(INTERNAL_ERROR, 500)
 
 @app.put("/characters/<id>")
 def update_character(id):
     try:
         data = request.get_json(silent=True) or {}
-        df = load_csv()
-        if id not in df["id"].values:
-            return jsonify({"error": "Character not found"}), 404
+        # Ids are never added, only removed, so a miss here is final and
+        # unknown ids are rejected without taking the write locks.
+        table = load_csv()
+        i = table.idx.get(id)
+        if i is None:
+            return error_response(CHARACTER_NOT_FOUND, 404)
+        changes = {col: str(val) for col, val in data.items() if col in table.data and col != "id"}
+        if not changes:
+            return jsonify({"data": table.row(i)}), 200
 
-        for col, val in data.items():
-            if col in df.columns and col != "id":
-                df.loc[df["id"] == id, col] = str(val)
+        with _WRITE_LOCK, _FILE_LOCK:
+            table = load_csv()
+            i = table.idx.get(id)
+            if i is None:
+                return error_response(CHARACTER_NOT_FOUND, 404)
 
-        save_csv(df)
-        updated = df[df["id"] == id].iloc[0].to_dict()
+            table = table.copy(changes)
+            table.update(i, changes)
+            append_journal(table, [("U", id, col, val) for col, val in changes.items()])
+            updated = table.row(i)
         return jsonify({"data": updated}), 200
     except Exception:
         logger.exception("PUT /characters failed")
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(INTERNAL_ERROR, 500)
 
 @app.delete("/characters/<id>")
 def delete_character(id):
     try:
-        df = load_csv()
-        if id not in df["id"].values:
-            return jsonify({"error": "Character not found"}), 404
+        if id not in load_csv().idx:
+            return error_response(CHARACTER_NOT_FOUND, 404)
+        with _WRITE_LOCK, _FILE_LOCK:
+            table = load_csv()
+            i = table.idx.get(id)
+            if i is None:
+                return error_response(CHARACTER_NOT_FOUND, 404)
 
-        df = df[df["id"] != id]
-        save_csv(df)
+            table = table.copy()
+            table.delete(i)
+            append_journal(table, [("D", id)])
         return ("", 204)
     except Exception:
         logger.exception("DELETE /characters failed")
-        return jsonify({"error": "Internal server error"}), 500
+        return error_response(INTERNAL_ERROR, 500)
 
 @app.errorhandler(404)
 def not_found(_):
-    return jsonify({"error": "Route not found"}), 404
+    return error_response(ROUTE_NOT_FOUND, 404)
 
 if __name__ == "__main__":
     app.run(port=5000, debug=False)